@@ -9,18 +9,17 @@ class Variable():
         self.j = j  # Column index where the variable starts
         self.direction = direction  # Direction of the variable (ACROSS or DOWN)
         self.length = length  # Length of the variable
-        self.cells = []  # List to store the cells occupied by the variable
+        self._hash = hash((i, j, direction, length))  # Variables never change, so hash once
 
-        # Generate the list of cells occupied by this variable
-        for k in range(self.length):
-            self.cells.append(
-                (self.i + (k if self.direction == Variable.DOWN else 0),  # Adjust row index for DOWN direction
-                 self.j + (k if self.direction == Variable.ACROSS else 0))  # Adjust column index for ACROSS direction
-            )
+        # Row and column step from one letter to the next
+        self.di, self.dj = (1, 0) if direction == Variable.DOWN else (0, 1)
+
+        # Generate the tuple of cells occupied by this variable
+        self.cells = tuple((i + k * self.di, j + k * self.dj) for k in range(length))
 
     def __hash__(self):
         """Return a hash value for the variable."""
-        return hash((self.i, self.j, self.direction, self.length))
+        return self._hash
 
     def __eq__(self, other):
         """Check equality between this variable and another."""
@@ -41,6 +40,14 @@ class Variable():
         return f"Variable({self.i}, {self.j}, {direction}, {self.length})"
 
 
+class Overlaps(dict):
+    """Overlapping cells keyed by pairs of variables; pairs that don't overlap map to None."""
+
+    def __missing__(self, key):
+        """Return None for a pair of variables that do not overlap."""
+        return None
+
+
 class Crossword():
     def __init__(self, structureFile, wordsFile):
         """Initialize the crossword structure and the word list."""
@@ -67,8 +74,13 @@ class Crossword():
         with open(wordsFile) as f:
             self.words = set(f.read().upper().splitlines())  # Convert words to uppercase and store in a set
 
-        # Determine the set of variables (words that can be placed in the crossword)
-        self.variables = set()
+        # Bucket the vocabulary by word length
+        self.wordsByLength = dict()
+        for word in self.words:
+            self.wordsByLength.setdefault(len(word), set()).add(word)
+
+        # Determine the list of variables (words that can be placed in the crossword)
+        self.variables = []
         for i in range(self.height):
             for j in range(self.width):
                 # Identify vertical words
@@ -85,7 +97,7 @@ class Crossword():
                         else:
                             break
                     if length > 1:  # Only add words with length greater than 1
-                        self.variables.add(Variable(
+                        self.variables.append(Variable(
                             i=i, j=j,
                             direction=Variable.DOWN,
                             length=length
@@ -105,36 +117,35 @@ class Crossword():
                         else:
                             break
                     if length > 1:  # Only add words with length greater than 1
-                        self.variables.add(Variable(
+                        self.variables.append(Variable(
                             i=i, j=j,
                             direction=Variable.ACROSS,
                             length=length
                         ))
 
+        # Index which variables cover each cell, along with the letter position
+        cellIndex = dict()
+        for var in self.variables:
+            for k, cell in enumerate(var.cells):
+                cellIndex.setdefault(cell, []).append((var, k))
+
         # Compute overlaps for each word
         # For any pair of variables v1, v2, their overlap is either:
         #    None, if the two variables do not overlap; or
         #    (i, j), where v1's ith character overlaps v2's jth character
-        self.overlaps = dict()  # Dictionary to store overlaps between variables
-        for v1 in self.variables:
-            for v2 in self.variables:
-                if v1 == v2:  # Skip if both variables are the same
-                    continue
-                cells1 = v1.cells
-                cells2 = v2.cells
-                intersection = set(cells1).intersection(cells2)  # Find overlapping cells
-                if not intersection:  # No overlap
-                    self.overlaps[v1, v2] = None
-                else:
-                    intersection = intersection.pop()  # Get one overlapping cell
-                    self.overlaps[v1, v2] = (
-                        cells1.index(intersection),  # Index of the overlap in v1
-                        cells2.index(intersection)   # Index of the overlap in v2
-                    )
+        # Only the pairs that overlap are stored
+        self.overlaps = Overlaps()
+        self.neighborCache = {var: set() for var in self.variables}
+        for entries in cellIndex.values():
+            # Every cell covered by more than one variable is an overlap
+            for v1, k1 in entries:
+                for v2, k2 in entries:
+                    if v1 != v2:
+                        self.overlaps[v1, v2] = (k1, k2)
+                        self.neighborCache[v1].add(v2)
 
+        # Freeze each variable's overlapping variables, as they never change
+        self.neighborCache = {var: frozenset(neighbors) for var, neighbors in self.neighborCache.items()}
     def neighbors(self, var):
         """Given a variable, return the set of overlapping variables."""
-        return set(
-            v for v in self.variables
-            if v != var and self.overlaps[v, var]  # Exclude the variable itself and check for overlaps
-        )
+        return self.neighborCache[var]
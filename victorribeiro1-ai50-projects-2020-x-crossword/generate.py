@@ -1,5 +1,5 @@
 import sys
-import copy
+from collections import Counter, deque
 
 from crossword import *
 
@@ -11,24 +11,48 @@ class CrosswordCreator():
         """
         self.crossword = crossword
         self.domains = {
-            var: self.crossword.words.copy()  # Initialize domains for each variable with a copy of the words
+            # Initialize domains for each variable with a copy of the words of its length
+            var: set(self.crossword.wordsByLength.get(var.length, ()))
             for var in self.crossword.variables
         }
+        # For each variable and position, how many domain words place each letter
+        # there, and the bitmask of those letters
+        self.letterCounts = {}
+        self.letterMasks = {}
+        for var in self.domains:
+            self.updateLetterCounts(var)
+
+    def updateLetterCounts(self, var, removed=None):
+        """
+        Recompute the per-position letter counts and bitmasks for `var` from its domain.
+
+        If `removed` lists the words just dropped from the domain and is smaller
+        than what is left, their letters are subtracted from the existing counts
+        instead. New Counters are built either way, so saved copies stay intact.
+        """
+        if removed is not None and len(removed) < len(self.domains[var]):
+            counts = [
+                letters - Counter(word[k] for word in removed)  # Drops letters whose count reaches zero
+                for k, letters in enumerate(self.letterCounts[var])
+            ]
+        else:
+            counts = [Counter(word[k] for word in self.domains[var]) for k in range(var.length)]
+        self.letterCounts[var] = counts
+        # Set the bit for every letter that appears at each position
+        self.letterMasks[var] = [sum(1 << ord(letter) for letter in letters) for letters in counts]
 
     def letterGrid(self, assignment):
         """
         Create a 2D array (grid) representing the given assignment of letters.
         """
         letters = [
-            [None for _ in range(self.crossword.width)]  # Create an empty grid of the crossword's width
+            [None] * self.crossword.width  # Create an empty row of the crossword's width
             for _ in range(self.crossword.height)  # Create a grid for the crossword's height
         ]
         for variable, word in assignment.items():
-            direction = variable.direction  # Get the direction of the variable
-            for k in range(len(word)):
-                i = variable.i + (k if direction == Variable.DOWN else 0)  # Row index based on direction
-                j = variable.j + (k if direction == Variable.ACROSS else 0)  # Column index based on direction
-                letters[i][j] = word[k]  # Assign the letter to the grid
+            # Place each letter in the cell the variable already knows it occupies
+            for (i, j), letter in zip(variable.cells, word):
+                letters[i][j] = letter  # Assign the letter to the grid
         return letters
 
     def print(self, assignment):
@@ -97,64 +121,62 @@ class CrosswordCreator():
         """
         Update `self.domains` such that each variable is node-consistent.
         """
-        domainCopy = copy.deepcopy(self.domains)  # Create a deep copy of the domains
-
-        # Iterate through the variables in the domain copy
-        for variable in domainCopy:
-            length = variable.length  # Get the length of the variable
-            # Iterate through words in the copied domain
-            for word in domainCopy[variable]:
-                if len(word) != length:  # If word length does not match variable length
-                    self.domains[variable].remove(word)  # Remove the word from the original domain
+        # Iterate through the variables in the domains
+        for variable in self.domains:
+            # Keep only the words whose length matches the variable's length
+            self.domains[variable] &= self.crossword.wordsByLength.get(variable.length, set())
+            self.updateLetterCounts(variable)  # Refresh the letter counts for the new domain
 
     def revise(self, x, y):
         """
         Make variable `x` arc consistent with variable `y`.
         """
-        xOverlap, yOverlap = self.crossword.overlaps[x, y]  # Get overlapping cells between x and y
-
-        revisionMade = False  # Track if a revision was made
-
-        domainsCopy = copy.deepcopy(self.domains)  # Make a deep copy of the domains
-
-        if xOverlap:  # If there is an overlap
-            # Iterate through words in x's domain
-            for xWord in domainsCopy[x]:
-                matchedValue = False  # Track if a matching value was found
-                # Iterate through words in y's domain
-                for yWord in self.domains[y]:
-                    # Check if x's word and y's word have the same letter in the overlapping position
-                    if xWord[xOverlap] == yWord[yOverlap]:
-                        matchedValue = True
-                        break  # No need to check the rest of y's words for this x
-                if matchedValue:
-                    continue  # Proceed to the next x if a match was found
-                else:
-                    self.domains[x].remove(xWord)  # Remove x's word as there was no matching y's word
-                    revisionMade = True  # Mark that a revision was made
-
-        return revisionMade  # Return if a revision was made
+        overlap = self.crossword.overlaps[x, y]  # Get overlapping cells between x and y
+        if overlap is None:  # If there is no overlap, nothing to revise
+            return False
+        xOverlap, yOverlap = overlap
+
+        # Letters y's words can place in the shared cell
+        yMask = self.letterMasks[y][yOverlap]
+        # If every letter x can place there is also allowed by y, nothing to remove
+        xMask = self.letterMasks[x][xOverlap]
+        if xMask & yMask == xMask:
+            return False
+        # Find x's words whose overlapping letter is not supported by y
+        removed = [xWord for xWord in self.domains[x] if not yMask >> ord(xWord[xOverlap]) & 1]
+        if not removed:
+            return False
+        self.domains[x] = self.domains[x].difference(removed)  # Drop the unsupported words
+        self.updateLetterCounts(x, removed)  # Keep x's letter counts in step with its domain
+        return True  # A revision was made
 
     def ac3(self, arcs=None):
         """
         Enforce arc consistency for the variables.
         """
-        if not arcs:
+        if arcs is None:
             # Initialize queue with all arcs in the problem
-            queue = []
+            queue = deque()
             for variable1 in self.domains:
                 for variable2 in self.crossword.neighbors(variable1):
                     if self.crossword.overlaps[variable1, variable2] is not None:
                         queue.append((variable1, variable2))  # Add the arc to the queue
-
-        while len(queue) > 0:  # While there are arcs to process
-            x, y = queue.pop(0)  # Get the next arc from the queue
+        else:
+            queue = deque(arcs)  # Start from the provided arcs only
+        queued = set(queue)  # Arcs currently waiting in the queue
+
+        while queue:  # While there are arcs to process
+            arc = queue.popleft()  # Get the next arc from the queue
+            queued.discard(arc)
+            x, y = arc
             if self.revise(x, y):  # Revise the domain of x based on y
                 if len(self.domains[x]) == 0:  # If x's domain is empty, return False
                     return False
                 for neighbour in self.crossword.neighbors(x):
-                    if neighbour != y:  # Add neighboring arcs to the queue
+                    # Add neighboring arcs to the queue unless already waiting
+                    if neighbour != y and (neighbour, x) not in queued:
                         queue.append((neighbour, x))
+                        queued.add((neighbour, x))
         return True  # Return True if arc consistency is enforced without empty domains
 
     def assignmentComplete(self, assignment):
@@ -167,11 +189,34 @@ class CrosswordCreator():
                 return False  # Assignment is not complete
         return True  # All variables are assigned a value
 
-    def consistent(self, assignment):
+    def consistent(self, assignment, variable=None, usedWords=None):
         """
         Return True if `assignment` is consistent (i.e., words fit in crossword
         puzzle without conflicting characters); return False otherwise.
+
+        If `variable` is given, the rest of `assignment` is assumed to be
+        consistent already and only the constraints involving `variable` are checked.
+        `usedWords`, if given, is the set of words assigned to the other variables.
         """
+        if variable is not None:
+            value = assignment[variable]  # Word just assigned to the variable
+            if usedWords is None:
+                usedWords = {word for other, word in assignment.items() if other != variable}
+
+            # Check the word is the correct length and not used by another variable
+            if variable.length != len(value):
+                return False
+            if value in usedWords:
+                return False
+
+            # Check for conflicts with the assigned neighbors of the variable
+            for neighbour in self.crossword.neighbors(variable):
+                if neighbour in assignment:
+                    x, y = self.crossword.overlaps[variable, neighbour]  # Get overlap indices
+                    if value[x] != assignment[neighbour][y]:  # If letters conflict
+                        return False
+            return True
+
         # Check if all values are distinct, every value is the correct length,
         # and there are no conflicts between neighboring variables.
 
@@ -203,33 +248,23 @@ class CrosswordCreator():
         The first value in the list, for example, should be the one
         that rules out the fewest values among the neighbors of `var`.
         """
-        # Create a temporary dictionary to hold values and their eliminated counts
-        wordDict = {}
-
-        # Get neighbors of the variable
-        neighbours = self.crossword.neighbors(var)
-
-        # Iterate through words in the variable's domain
-        for word in self.domains[var]:
-            eliminated = 0  # Count of eliminated neighbor words
-            for neighbour in neighbours:
-                # Skip counting if the neighbor already has an assigned value
-                if neighbour in assignment:
-                    continue
-                else:
-                    # Calculate the overlap between the variable and its neighbor
-                    xOverlap, yOverlap = self.crossword.overlaps[var, neighbour]
-                    for neighbourWord in self.domains[neighbour]:  # Check each word in the neighbor's domain
-                        # Count eliminated words based on the overlap
-                        if word[xOverlap] != neighbourWord[yOverlap]:  # If letters do not match
-                            eliminated += 1  # Increment eliminated count
-            # Add the word and its eliminated count to the temporary dictionary
-            wordDict[word] = eliminated
-
-        # Sort the dictionary by the number of eliminated neighbor values
-        sortedDict = {k: v for k, v in sorted(wordDict.items(), key=lambda item: item[1])}
-
-        return [*sortedDict]  # Return the sorted list of words
+        # For each unassigned neighbour, look up how many of its words hold each
+        # letter at the shared cell, so a word's eliminated count is a lookup
+        columns = []
+        for neighbour in self.crossword.neighbors(var):
+            # Skip counting if the neighbor already has an assigned value
+            if neighbour in assignment:
+                continue
+            xOverlap, yOverlap = self.crossword.overlaps[var, neighbour]
+            letterCounts = self.letterCounts[neighbour][yOverlap]
+            columns.append((xOverlap, len(self.domains[neighbour]), letterCounts))
+
+        # Words that don't share the neighbour's letter rule out its remaining values
+        def eliminated(word):
+            return sum(total - letterCounts[word[xOverlap]] for xOverlap, total, letterCounts in columns)
+
+        # Sort the words by the number of eliminated neighbor values
+        return sorted(self.domains[var], key=eliminated)
 
     def selectUnassignedVariable(self, assignment):
         """
@@ -240,26 +275,20 @@ class CrosswordCreator():
         return values.
         """
 
-        choiceDict = {}  # Temporary dictionary for storing choices
-
-        # Iterate through variables in the domains
-        for variable in self.domains:
-            # Check if the variable is not already assigned
-            if variable not in assignment:
-                choiceDict[variable] = self.domains[variable]  # Add to temporary dictionary
-
-        # Create a list of variables sorted by the number of remaining values
-        sortedList = [v for v, k in sorted(choiceDict.items(), key=lambda item: len(item[1]))]
-
-        # Return the variable with the minimum number of remaining values
-        return sortedList[0]
+        # Unassigned variable with the fewest remaining values, breaking ties
+        # by the highest degree (number of neighbors)
+        return min(
+            (variable for variable in self.domains if variable not in assignment),
+            key=lambda variable: (len(self.domains[variable]), -len(self.crossword.neighbors(variable)))
+        )
 
-    def backtrack(self, assignment):
+    def backtrack(self, assignment, usedWords=None):
         """
         Using Backtracking Search, take as input a partial assignment for the
         crossword and return a complete assignment if possible to do so.
 
         `assignment` is a mapping from variables (keys) to words (values).
+        `usedWords` is the set of words in `assignment`; it is built if not given.
 
         If no assignment is possible, return None.
         """
@@ -267,19 +296,46 @@ class CrosswordCreator():
         if len(assignment) == len(self.domains):
             return assignment  # Return the complete assignment
 
+        # Words already assigned, shared down the search so the duplicate check is a lookup
+        if usedWords is None:
+            usedWords = set(assignment.values())
+
         # Select one of the unassigned variables
         variable = self.selectUnassignedVariable(assignment)
 
-        # Iterate through words in the variable's domain
-        for value in self.domains[variable]:
+        # Iterate through words in the variable's domain, least constraining first
+        for value in self.orderDomainValues(variable, assignment):
             assignmentCopy = assignment.copy()  # Make a copy of the assignment
             assignmentCopy[variable] = value  # Assign the new value to the variable
 
-            # Check for consistency with the new assignment
-            if self.consistent(assignmentCopy):
-                result = self.backtrack(assignmentCopy)  # Recursive backtrack call
-                if result is not None:  # If a complete assignment is found
-                    return result  # Return the complete assignment
+            # Check the new assignment only against the variable just assigned
+            if self.consistent(assignmentCopy, variable, usedWords):
+                # Save the domains so the inferences can be undone; revise replaces
+                # domain sets rather than mutating them, so shallow copies suffice
+                domains = self.domains.copy()
+                letterCounts = self.letterCounts.copy()
+                letterMasks = self.letterMasks.copy()
+
+                # Maintain arc consistency: restrict the variable to its value and
+                # propagate that to the unassigned neighbors
+                self.domains[variable] = {value}
+                self.updateLetterCounts(variable)
+                arcs = [
+                    (neighbour, variable) for neighbour in self.crossword.neighbors(variable)
+                    if neighbour not in assignmentCopy
+                ]
+                # ac3 stops as soon as a neighbor's domain empties, pruning the value
+                if self.ac3(arcs):
+                    usedWords.add(value)  # Mark the word as used for the deeper search
+                    result = self.backtrack(assignmentCopy, usedWords)  # Recursive backtrack call
+                    if result is not None:  # If a complete assignment is found
+                        return result  # Return the complete assignment
+                    usedWords.remove(value)  # Free the word again for the next value
+
+                # Undo the inferences before trying the next value
+                self.domains = domains
+                self.letterCounts = letterCounts
+                self.letterMasks = letterMasks
         return None  # Return None if no assignment is possible
 
 def main():
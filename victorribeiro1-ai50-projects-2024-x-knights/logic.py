@@ -261,3 +261,21 @@ def model_check(knowledge, query):
 
     # Check that knowledge entails query
     return check_all(knowledge, query, symbols, dict())
+
+
+def model_check_all(knowledge, queries):
+    """Returns the queries entailed by knowledge base, enumerating models once."""
+
+    # Get all symbols in knowledge and every query
+    symbols = sorted(set.union(knowledge.symbols(), *[query.symbols() for query in queries]))
+
+    # Find every model in which the knowledge base is true
+    models = []
+    for values in itertools.product([True, False], repeat=len(symbols)):
+        model = dict(zip(symbols, values))
+        if knowledge.evaluate(model):
+            models.append(model)
+
+    # Knowledge entails a query if the query is true in all of those models
+    return [query for query in queries
+            if all(query.evaluate(model) for model in models)]
@@ -63,28 +63,19 @@ knowledge3 = And(
     Or(CKnight, CKnave),        # C is either a knight or a knave
 
     # A says either "I am a knight." or "I am a knave."
-    Or(
-        And(Implication(AKnight, AKnight), Implication(AKnave, Not(AKnight))),
-        And(Implication(AKnight, AKnave), Implication(AKnave, Not(AKnave)))
-    ),
-
-    Not(And(
-        And(Implication(AKnight, AKnight), Implication(AKnave, Not(AKnight))),
-        And(Implication(AKnight, AKnave), Implication(AKnave, Not(AKnave)))
-    )),
+    # A knight's statement is true and a knave's is false, so "A says X" is AKnight <=> X.
+    # Saying "I am a knight" always holds, so this reduces to A not saying "I am a knave",
+    # which the constraints above already guarantee: A's statement carries no information
+    Not(Biconditional(AKnight, AKnave)),
 
     # B claims A said "I am a knave."
-    Implication(BKnight, And(Implication(AKnight, AKnave), Implication(AKnave, Not(AKnave)))),
-
-    Implication(BKnave, Not(And(Implication(AKnight, AKnave), Implication(AKnave, Not(AKnave))))),
+    Biconditional(BKnight, Biconditional(AKnight, AKnave)),
 
     # B claims C is a knave.
-    Implication(BKnight, CKnave),
-    Implication(BKnave, Not(CKnave)),
+    Biconditional(BKnight, CKnave),
 
     # C says A is a knight.
-    Implication(CKnight, AKnight),
-    Implication(CKnave, Not(AKnight))
+    Biconditional(CKnight, AKnight)
 )
 
 
@@ -101,9 +92,8 @@ def main():
         if len(knowledge.conjuncts) == 0:
             print("    Not yet implemented.")
         else:
-            for symbol in symbols:
-                if model_check(knowledge, symbol):
-                    print(f"    {symbol}")
+            for symbol in model_check_all(knowledge, symbols):
+                print(f"    {symbol}")
 
 
 if __name__ == "__main__":
@@ -7,6 +7,9 @@ import sys
 DAMPING = 0.85
 SAMPLES = 10000
 
+# Pattern matching the target of each link in an HTML page
+LINK_PATTERN = re.compile(r"<a\s+(?:[^>]*?)href=\"([^\"]*)\"")
+
 def main():
     if len(sys.argv) != 2:
         sys.exit("Usage: python pagerank.py corpus")
@@ -39,11 +42,11 @@ def crawl(directory):
         if not filename.endswith(".html"):
             continue
         with open(os.path.join(directory, filename)) as f:
-            contents = f.read()
-            # Find all links in each HTML page
-            links = re.findall(r"<a\s+(?:[^>]*?)href=\"([^\"]*)\"", contents)
-            # Remove self-links (if any)
-            pages[filename] = set(links) - {filename}
+            # Find all links in each HTML page, removing self-links (if any)
+            pages[filename] = {
+                match.group(1) for match in LINK_PATTERN.finditer(f.read())
+                if match.group(1) != filename
+            }
 
     # Filter to include only valid links within the corpus
     for filename in pages:
@@ -94,33 +97,48 @@ def samplePageRank(corpus, dampingFactor, n):
     their estimated PageRank (values between 0 and 1). All PageRank values sum to 1.
     """
 
-    # Initialize sample counts to zero
-    samplesDict = corpus.copy()
-    for i in samplesDict:
-        samplesDict[i] = 0
+    names, rowPtr, colIdx = buildGraph(corpus)
+    totalPages = len(names)
 
-    sample = None
+    # Initialize sample counts to zero, indexed by page id
+    counts = [0] * totalPages
 
-    # Perform `n` samples
+    # Perform `n` samples, starting with a random page
+    sample = random.randrange(totalPages)
     for _ in range(n):
-        if sample:
-            # Choose next page based on the transition model
-            dist = transitionModel(corpus, sample, dampingFactor)
-            distList = list(dist.keys())
-            distWeights = [dist[i] for i in dist]
-            sample = random.choices(distList, distWeights, k=1)[0]
-        else:
-            # For the first sample, choose a random page
-            sample = random.choice(list(corpus.keys()))
-
         # Increment the count for the sampled page
-        samplesDict[sample] += 1
+        counts[sample] += 1
+
+        # Choose next page based on the transition model: with probability
+        # `dampingFactor` follow a random link, otherwise (or if the page
+        # has no links) jump to a random page in the corpus
+        start, end = rowPtr[sample], rowPtr[sample + 1]
+        if start < end and random.random() < dampingFactor:
+            sample = colIdx[random.randrange(start, end)]
+        else:
+            sample = random.randrange(totalPages)
 
     # Convert sample counts to probabilities
-    for item in samplesDict:
-        samplesDict[item] /= n
+    return {page: count / n for page, count in zip(names, counts)}
+
+def buildGraph(corpus):
+    """
+    Index the corpus by integer page ids in compressed sparse row form.
+
+    Returns a tuple `(names, rowPtr, colIdx)` where `names` lists the pages
+    in sorted order (a page's id is its position in the list) and the links
+    of page `u` are the ids `colIdx[rowPtr[u]:rowPtr[u + 1]]`.
+    """
+    names = sorted(corpus)
+    ids = {page: i for i, page in enumerate(names)}
+
+    rowPtr = [0]
+    colIdx = []
+    for page in names:
+        colIdx.extend(map(ids.__getitem__, corpus[page]))
+        rowPtr.append(len(colIdx))
 
-    return samplesDict
+    return names, rowPtr, colIdx
 
 def iteratePageRank(corpus, dampingFactor):
     """
@@ -131,39 +149,56 @@ def iteratePageRank(corpus, dampingFactor):
     their estimated PageRank. All values sum to 1.
     """
 
-    totalPages = len(corpus)
-    oldRanks = {}
-    newRanks = {}
+    names, rowPtr, colIdx = buildGraph(corpus)
+    totalPages = len(names)
+
+    # Fraction of a page's rank passed along each of its links, computed once
+    linkWeights = [
+        dampingFactor / (rowPtr[u + 1] - rowPtr[u]) if rowPtr[u + 1] > rowPtr[u] else 0
+        for u in range(totalPages)
+    ]
+
+    # Pages linking to each page, paired with the fraction of their rank
+    # passed along that link, so a page's rank can be gathered from them
+    incoming = [[] for _ in range(totalPages)]
+    for u in range(totalPages):
+        for v in colIdx[rowPtr[u]:rowPtr[u + 1]]:
+            incoming[v].append((u, linkWeights[u]))
+
+    # Pages with no links, whose rank is distributed uniformly to all pages
+    danglingPages = [u for u in range(totalPages) if rowPtr[u] == rowPtr[u + 1]]
 
     # Initialize each page with a rank of 1/n
-    for page in corpus:
-        oldRanks[page] = 1 / totalPages
+    ranks = [1 / totalPages] * totalPages
 
-    # Iterate until PageRank values stabilize (convergence)
+    # Iterate until PageRank values stabilize (convergence), updating ranks in
+    # place so pages later in a sweep already use this sweep's new values
     while True:
-        for page in corpus:
-            tempRank = 0
-            for linkingPage in corpus:
-                # Check if the current page is linked by linkingPage
-                if page in corpus[linkingPage]:
-                    tempRank += (oldRanks[linkingPage] / len(corpus[linkingPage]))
-                # If a page has no links, distribute uniformly to all pages
-                if len(corpus[linkingPage]) == 0:
-                    tempRank += (oldRanks[linkingPage]) / len(corpus)
-
-            # Apply damping factor and calculate the new rank
-            tempRank *= dampingFactor
-            tempRank += (1 - dampingFactor) / totalPages
-            newRanks[page] = tempRank
-
-        # Check if the maximum change in PageRank values is less than the threshold
-        difference = max([abs(newRanks[x] - oldRanks[x]) for x in oldRanks])
+        # Share of the dangling pages' rank each page receives
+        danglingMass = sum(ranks[u] for u in danglingPages) / totalPages
+
+        # Every page gets the random jump plus its share of the dangling rank
+        base = (1 - dampingFactor) / totalPages + dampingFactor * danglingMass
+
+        difference = 0
+        for v in range(totalPages):
+            # Gather the rank passed along each link into the page
+            newRank = base
+            for u, weight in incoming[v]:
+                newRank += ranks[u] * weight
+
+            # Track the maximum change in PageRank values during the sweep
+            change = abs(newRank - ranks[v])
+            if change > difference:
+                difference = change
+            ranks[v] = newRank
+
         if difference < 0.001:
             break
-        else:
-            oldRanks = newRanks.copy()
 
-    return oldRanks
+    # In-place updates do not keep the total at exactly 1, so normalize
+    total = sum(ranks)
+    return {page: rank / total for page, rank in zip(names, ranks)}
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
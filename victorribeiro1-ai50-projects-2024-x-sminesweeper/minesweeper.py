@@ -1,9 +1,22 @@
 import itertools
 import random
-import copy
 from typing import TYPE_CHECKING
 
 
+def neighboring_cells(cell, height, width):
+    """
+    Returns the cells adjacent to `cell` on a board of the given
+    height and width, excluding the cell itself.
+    """
+    i, j = cell
+    return [
+        (y, x)
+        for y in range(max(i - 1, 0), min(i + 2, height))
+        for x in range(max(j - 1, 0), min(j + 2, width))
+        if (y, x) != (i, j)
+    ]
+
+
 class Minesweeper():
     """
     Representation of the Minesweeper game.
@@ -14,23 +27,20 @@ class Minesweeper():
         # Initialize height, width, and number of mines
         self.height = height
         self.width = width
-        self.mines = set()
 
-        # Create an empty board with no mines
-        self.board = []
-        for i in range(self.height):
-            row = []
-            for j in range(self.width):
-                row.append(False)
-            self.board.append(row)
+        # Randomly place mines on the board, drawing distinct cells in one call;
+        # the bitboard of the mines is the only record of where they are, with
+        # cell (i, j) stored as bit i * width + j
+        self.mine_mask = 0
+        for index in random.sample(range(height * width), mines):
+            self.mine_mask |= 1 << index
 
-        # Randomly place mines on the board
-        while len(self.mines) != mines:
-            i = random.randrange(height)
-            j = random.randrange(width)
-            if not self.board[i][j]:
-                self.mines.add((i, j))
-                self.board[i][j] = True
+        # Bitboard of the cells adjacent to each cell, excluding the cell itself
+        self.neighbor_masks = [
+            sum(1 << (y * width + x) for y, x in neighboring_cells((i, j), height, width))
+            for i in range(height)
+            for j in range(width)
+        ]
 
         # Initially, the player has not found any mines
         self.mines_found = set()
@@ -42,40 +52,37 @@ class Minesweeper():
         for i in range(self.height):
             print("--" * self.width + "-")
             for j in range(self.width):
-                if self.board[i][j]:
+                if self.is_mine((i, j)):
                     print("|X", end="")
                 else:
                     print("| ", end="")
             print("|")
         print("--" * self.width + "-")
 
+    @property
+    def mines(self):
+        """
+        The set of cells that contain mines.
+        """
+        return {
+            divmod(index, self.width)
+            for index in range(self.height * self.width)
+            if self.mine_mask >> index & 1
+        }
+
     def is_mine(self, cell):
         i, j = cell
-        return self.board[i][j]
+        return bool(self.mine_mask >> (i * self.width + j) & 1)
 
     def nearby_mines(self, cell):
         """
         Counts the number of mines adjacent to a given cell,
         excluding the cell itself.
         """
+        i, j = cell
 
-        # Count nearby mines
-        count = 0
-
-        # Iterate over all adjacent cells
-        for i in range(cell[0] - 1, cell[0] + 2):
-            for j in range(cell[1] - 1, cell[1] + 2):
-
-                # Skip the cell itself
-                if (i, j) == cell:
-                    continue
-
-                # Increase count if the cell is within bounds and contains a mine
-                if 0 <= i < self.height and 0 <= j < self.width:
-                    if self.board[i][j]:
-                        count += 1
-
-        return count
+        # Count the mines among the bits of the cell's neighbors
+        return bin(self.mine_mask & self.neighbor_masks[i * self.width + j]).count("1")
 
     def won(self):
         """
@@ -106,7 +113,7 @@ class Sentence():
         Returns the cells in self.cells that are confirmed as mines.
         """
         if len(self.cells) == self.count:
-            return copy.deepcopy(self.cells)
+            return self.cells.copy()
         
         return None
 
@@ -115,7 +122,7 @@ class Sentence():
         Returns the cells in self.cells that are confirmed as safe.
         """
         if self.count == 0:
-            return copy.deepcopy(self.cells)
+            return self.cells.copy()
 
         return None
 
@@ -136,6 +143,22 @@ class Sentence():
         if cell in self.cells:
             self.cells.discard(cell)
 
+    def mark_mines(self, cells):
+        """
+        Updates the internal representation based on the knowledge
+        that all of `cells` are confirmed as mines.
+        """
+        overlap = self.cells & cells
+        self.cells -= overlap
+        self.count -= len(overlap)
+
+    def mark_safes(self, cells):
+        """
+        Updates the internal representation based on the knowledge
+        that all of `cells` are confirmed as safe.
+        """
+        self.cells -= cells
+
 
 class MinesweeperAI():
     """
@@ -158,6 +181,15 @@ class MinesweeperAI():
         # List of sentences that represent the game's knowledge
         self.knowledge = []
 
+        # Every cell on the board, and the cells adjacent to each one
+        self.all_cells = frozenset(
+            (i, j) for i in range(height) for j in range(width)
+        )
+        self.neighbors = {
+            cell: frozenset(neighboring_cells(cell, height, width))
+            for cell in self.all_cells
+        }
+
     def mark_mine(self, cell):
         """
         Identifies a cell as a mine and updates all knowledge
@@ -176,6 +208,24 @@ class MinesweeperAI():
         for sentence in self.knowledge:
             sentence.mark_safe(cell)
 
+    def mark_mines(self, cells):
+        """
+        Identifies all of `cells` as mines and updates all knowledge
+        to reflect that they are mines.
+        """
+        self.mines |= cells
+        for sentence in self.knowledge:
+            sentence.mark_mines(cells)
+
+    def mark_safes(self, cells):
+        """
+        Identifies all of `cells` as safe and updates all knowledge
+        to reflect that they are safe.
+        """
+        self.safes |= cells
+        for sentence in self.knowledge:
+            sentence.mark_safes(cells)
+
     def add_knowledge(self, cell, count):
         """
         Invoked when the Minesweeper board indicates how many neighboring
@@ -192,35 +242,104 @@ class MinesweeperAI():
                they can be inferred from existing knowledge
         """
 
+        # Index the knowledge once for this call. Sentences are only appended while
+        # inferring; one that becomes empty or repeats another's cells is set to None
+        sentences = []
+        positions = dict()  # Position of the sentence holding each set of cells
+        sentences_by_cell = dict()  # Positions of the sentences mentioning each cell
+        worklist = []  # Positions of sentences added or changed and not yet inferred from
+
+        def add(sentence):
+            """
+            Appends `sentence` unless it is empty or repeats a known set of cells.
+            """
+            key = frozenset(sentence.cells)
+            if not key or key in positions:
+                return
+            position = len(sentences)
+            sentences.append(sentence)
+            positions[key] = position
+            for c in key:
+                sentences_by_cell.setdefault(c, set()).add(position)
+            worklist.append(position)
+
+        def mark(cells, mine):
+            """
+            Marks all of `cells` as mines or as safe, updating only
+            the sentences that mention them.
+            """
+            if mine:
+                self.mines |= cells
+            else:
+                self.safes |= cells
+
+            changed = set()
+            for c in cells:
+                changed |= sentences_by_cell.pop(c, set())
+
+            # Drop the old keys first, so sentences that shrink to the same cells are caught
+            for position in changed:
+                del positions[frozenset(sentences[position].cells)]
+            for position in changed:
+                sentence = sentences[position]
+                if mine:
+                    sentence.mark_mines(cells)
+                else:
+                    sentence.mark_safes(cells)
+
+                key = frozenset(sentence.cells)
+                if key and key not in positions:
+                    positions[key] = position
+                    worklist.append(position)
+                else:
+                    sentences[position] = None
+                    for c in key:
+                        sentences_by_cell[c].discard(position)
+
+        # The knowledge from earlier moves was already inferred from
+        for sentence in self.knowledge:
+            add(sentence)
+        worklist.clear()
+
         # 1 & 2
         self.moves_made.add(cell)
-        self.mark_safe(cell)
+        mark({cell}, mine=False)
 
         # 3
-        surrounding_cells = self.get_surrounding_cells(cell)
-        sentence = Sentence(surrounding_cells, count)
-        self.knowledge.append(sentence)
-        
-        # 4
-        for s in self.knowledge:
-            known_mines = s.known_mines()
-            known_safes = s.known_safes()
-
+        # Leave out neighbors already known to be safe or mines, taking the
+        # known mines off the count, so the sentence only covers unknown cells
+        surrounding_cells = self.get_surrounding_cells(cell) - self.safes
+        known_nearby = surrounding_cells & self.mines
+        add(Sentence(surrounding_cells - known_nearby, count - len(known_nearby)))
+
+        # Repeat steps 4 and 5 for each added or changed sentence until none are left
+        while worklist:
+            sentence = sentences[worklist.pop()]
+            if sentence is None:
+                continue
+
+            # 4
+            # Marking empties the sentence, so there is nothing left to infer from it
+            known_mines = sentence.known_mines()
             if known_mines:
-                for mineCell in known_mines:
-                    self.mark_mine(mineCell)
-            
+                mark(known_mines, mine=True)
+                continue
+            known_safes = sentence.known_safes()
             if known_safes:
-                for safeCell in known_safes:
-                    self.mark_safe(safeCell)
-
-        # 5
-        for i, s1 in enumerate(self.knowledge):
-            for j, s2 in enumerate(self.knowledge):
-                if s1.cells in s2.cells and i != j:
-                    newSentence = Sentence(set(s2.cells - s1.cells), s2.count - s1.count)
-                    self.knowledge.append(newSentence)
-        
+                mark(known_safes, mine=False)
+                continue
+
+            # 5
+            # Only sentences sharing a cell can be a subset or superset of this one
+            related = set().union(*[sentences_by_cell[c] for c in sentence.cells])
+            for position in related:
+                other = sentences[position]
+                if sentence.cells < other.cells:
+                    add(Sentence(other.cells - sentence.cells, other.count - sentence.count))
+                elif other.cells < sentence.cells:
+                    add(Sentence(sentence.cells - other.cells, sentence.count - other.count))
+
+        self.knowledge = [s for s in sentences if s is not None]
 
     def make_safe_move(self):
         """
@@ -233,7 +352,7 @@ class MinesweeperAI():
         if self.safes:
             for safe in self.safes:
                 if safe not in self.moves_made:
-                    return copy.deepcopy(safe)
+                    return safe
         
         return None
 
@@ -252,26 +371,13 @@ class MinesweeperAI():
         uncertainCells = (allCells - self.moves_made) - self.mines
 
         try:
-            return uncertainCells.pop()
-        except Exception:
+            return next(iter(uncertainCells))
+        except StopIteration:
             print("NO UNCERTAIN CELLS")
             return None
 
     def get_all_cells(self):
-        allCells = set()
-        for i in range(0, self.height):
-            for j in range(0, self.width):
-                allCells.add((i, j))
-        return allCells
+        return self.all_cells
 
     def get_surrounding_cells(self, cell):
-        surrounding_cells = set()
-
-        for i in range(0, 3):
-            for j in range(0, 3):
-                y = i + cell[0] - 1
-                x = j + cell[1] - 1
-                if x >= 0 and x < self.width and y >= 0 and y < self.height and (y, x) != cell and (y, x) not in self.moves_made:
-                    surrounding_cells.add((y, x))
-                
-        return surrounding_cells
\ No newline at end of file
+        return self.neighbors[cell] - self.moves_made